@@ -0,0 +1,16 @@
+"""
+Optional build hook that compiles the Cython simulation kernel.
+
+The package stays pure Python when Cython is unavailable; src/netlist.py
+falls back to its Python/NumPy loops if src._sim_kernel cannot be imported.
+"""
+
+
+def build(setup_kwargs):
+    try:
+        from Cython.Build import cythonize
+    except ImportError:
+        return
+    setup_kwargs.update(
+        ext_modules=cythonize(["src/_sim_kernel.pyx"], language_level=3),
+    )
@@ -0,0 +1,74 @@
+# cython: boundscheck=False, wraparound=False
+"""
+Native inner loops for the netlist simulation.
+
+These are line-for-line twins of the pure-Python loops in src/netlist.py,
+compiled to C so that one tick costs two function calls instead of one Python
+bytecode dispatch per transistor and per driver.  The module is optional:
+building it requires Cython (see build.py), and the netlist falls back to its
+Python/NumPy paths when the import fails.
+"""
+from libc.stdint cimport int8_t, int16_t, int32_t, uint8_t
+
+
+cpdef void prepare_transistors(
+    uint8_t[::1] wire_values,
+    int8_t[::1] wire_strengths,
+    uint8_t[::1] polarities,
+    int32_t[::1] gate_indices,
+    int32_t[::1] source_indices,
+    int32_t[::1] driver_indices,
+    int16_t[::1] driver_keys,
+):
+    """Evaluate every lowered transistor, writing packed driver keys."""
+    cdef Py_ssize_t row
+    cdef uint8_t gate, source
+    cdef int32_t driver
+    for row in range(polarities.shape[0]):
+        gate = wire_values[gate_indices[row]]
+        source = wire_values[source_indices[row]]
+        driver = driver_indices[row]
+        if gate != source and gate == polarities[row]:
+            driver_keys[driver] = <int16_t>((wire_strengths[source_indices[row]] << 1) | source)
+        else:
+            driver_keys[driver] = -2
+
+
+cpdef void commit_wires(
+    int16_t[::1] driver_keys,
+    Py_ssize_t[::1] offsets,
+    int32_t[::1] commit_indices,
+    uint8_t[::1] commit_biases,
+    uint8_t[::1] wire_values,
+    int8_t[::1] wire_strengths,
+    uint8_t[::1] conflicts,
+):
+    """Resolve every driven wire from its group of packed driver keys.
+
+    ``conflicts[k]`` is set to 1 if group k has a bus conflict: the winning
+    (odd) key is tied by a driver of the same strength driving low.
+    """
+    cdef Py_ssize_t k, row, start, end
+    cdef Py_ssize_t n_groups = offsets.shape[0]
+    cdef int16_t max_key, key
+    cdef int32_t index
+    cdef uint8_t rival
+    for k in range(n_groups):
+        start = offsets[k]
+        end = offsets[k + 1] if k + 1 < n_groups else driver_keys.shape[0]
+        max_key = driver_keys[start]
+        rival = 0
+        for row in range(start + 1, end):
+            key = driver_keys[row]
+            # Branchless running max plus a flag for the key one below it;
+            # whichever of the two ends up next to the final max matters.
+            rival = (rival & (key <= max_key)) | (key + 1 == max_key) | (max_key + 1 == key)
+            if key > max_key:
+                max_key = key
+        index = commit_indices[k]
+        if max_key < 0:
+            wire_values[index] = commit_biases[k]
+        else:
+            wire_values[index] = max_key & 1
+        wire_strengths[index] = <int8_t>(max_key >> 1)
+        conflicts[k] = rival & (max_key & 1) & (max_key >= 0)
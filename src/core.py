@@ -1,63 +1,164 @@
 """Base classes for components and wires"""
 
 from abc import ABCMeta, abstractmethod
-from collections.abc import Iterator
-from typing import List, Optional, Union
+from collections.abc import Iterable, Iterator
+from typing import List, Optional
+
+#: Packed (strength << 1) | value key of a released driver: strength -1,
+#: value 0.  Most transistors are off on any given tick, so the hot paths
+#: write this constant instead of re-deriving it from drive(False, -1).
+RELEASED_KEY = -1 << 1
+
+#: Upper bound on the number of recycled Wire instances kept for reuse; see
+#: Wire.obtain().
+_WIRE_POOL_LIMIT = 1 << 20
 
 
 class Driver:
     """This class represents a voltage source or sink that might be tristated.
 
     It drives some associated wire to some voltage level with some strength; higher strength drivers override weaker drivers.
+
+    Before a Netlist has been built the driver stores its own state.  Once it
+    has been given a row in the netlist's key array, that row is the only
+    storage: writes go straight to the array and the value/strength
+    attributes read back through it, so the simulation hot paths never touch
+    the driver object at all.
     """
-    
-    value: bool = False
-    strength: int = -1
 
-    def drive(self, value: bool, strength: int = 1) -> Driver:
+    __slots__ = ("_value", "_strength", "netlist", "index")
+
+    def __init__(self) -> None:
+        self._value = False
+        self._strength = -1
+        self.netlist = None  # type: Optional["src.netlist.Netlist"]
+        self.index = -1
+
+    @property
+    def value(self) -> bool:
+        if self.netlist is None:
+            return self._value
+        return bool(self.netlist.driver_keys[self.index] & 1)
+
+    @property
+    def strength(self) -> int:
+        if self.netlist is None:
+            return self._strength
+        return int(self.netlist.driver_keys[self.index]) >> 1
+
+    def drive(self, value: bool, strength: int = 1) -> "Driver":
         """Drive the wire to the given level strongly"""
-        self.value = value
-        self.strength = strength
+        if self.netlist is None:
+            self._value = value
+            self._strength = strength
+        else:
+            self.netlist.set_driver(self.index, value, strength)
         return self
 
-    def pull(self, value: bool) -> Driver:
+    def pull(self, value: bool) -> "Driver":
         """Drive the wire to the given level weakly (e.g., through a resistor)"""
         return self.drive(value, 0)
-        
-    def release(self) -> Driver:
+
+    def release(self) -> "Driver":
         """Drive the wire low very weakly; i.e., disconnect the wire"""
+        if self.netlist is not None:
+            self.netlist.set_driver_key(self.index, RELEASED_KEY)
+            return self
         return self.drive(False, -1)
 
-    def connect(self, other: "Wire"):
+    def connect(self, other: "Wire") -> "Driver":
         """Drive this wire from another wire"""
-        self.value = other.value
-        self.strength = other.strength
-    
+        # perf: do not refactor -- this is two attribute reads feeding
+        # drive(), on the hottest path of the object-graph simulation.
+        return self.drive(other.value, other.strength)
+
 
-    
 class Wire:
+    __slots__ = ("value", "strength", "bias", "drivers", "index", "conflict")
+
     value: bool
     strength: int
     drivers: List[Driver]
+    index: Optional[int]
+    #: True if the last commit found two drivers of the winning strength
+    #: disagreeing on the level (bus contention).
+    conflict: bool
+
+    #: Recycled instances handed back out by obtain(); elaborating a large
+    #: circuit allocates (and discards) wires per transistor, and reusing
+    #: them avoids the allocator and gen-0 GC cost of that churn.
+    _pool: List["Wire"] = []
 
-    def __init__(self, bias = False):
+    def __init__(self, bias: bool = False):
         self.value = self.bias = bias
+        self.strength = -1
         self.drivers = []
-        
+        self.index = None
+        self.conflict = False
+
+    @classmethod
+    def obtain(cls, bias: bool = False) -> "Wire":
+        """Return a fresh wire, reusing a recycled instance when one exists.
+
+        Equivalent to ``Wire(bias)``; the preferred allocator inside
+        elaboration code, where wires are created in bulk."""
+        if cls is Wire and cls._pool:
+            wire = cls._pool.pop()
+            wire.value = wire.bias = bias
+            wire.strength = -1
+            wire.index = None
+            wire.conflict = False
+            return wire
+        return cls(bias)
+
+    def recycle(self) -> None:
+        """Hand this wire back for reuse by obtain().
+
+        Only call this on a wire the caller exclusively owns: anything still
+        holding a reference would silently share state with whatever obtain()
+        hands the instance to next.  Rails and subclasses are never pooled."""
+        if type(self) is Wire and len(Wire._pool) < _WIRE_POOL_LIMIT:
+            # Keep the list object itself; obtain() reuses it in place.
+            del self.drivers[:]
+            Wire._pool.append(self)
+
     def commit(self):
-        strength = -1
-        value = self.bias
-        for driver in self.drivers:
-            if driver.strength < strength:
-                continue
-            else if driver.strength > strength:
-                value = driver.value
-                strength = driver.strength
-            else:
-                if value != driver.value:
-                    # Handle conflict somehow. 
-                    pass
-        self.value = value
+        # Packed keys (strength << 1) | value order exactly like
+        # (strength, value) pairs, so the winning driver is simply the max key
+        # and no per-driver branching is needed.  A conflict exists iff the
+        # max key is odd (winner drives high) and some driver holds the even
+        # key one below it: the same strength driving low.  (If the winner
+        # drives low, any high driver of equal strength would itself be the
+        # max, so no separate check is needed.)
+        #
+        # Most wires have 0-2 drivers (a transistor drain, maybe a pull-up),
+        # so those counts are unrolled and skip the list build entirely.
+        drivers = self.drivers
+        count = len(drivers)
+        if count == 0:
+            max_key = RELEASED_KEY
+            conflict = False
+        elif count == 1:
+            driver = drivers[0]
+            max_key = (driver.strength << 1) | driver.value
+            conflict = False
+        elif count == 2:
+            first, second = drivers
+            a = (first.strength << 1) | first.value
+            b = (second.strength << 1) | second.value
+            max_key = a if a > b else b
+            conflict = bool(max_key & 1) and a + b == 2 * max_key - 1
+        else:
+            keys = [(driver.strength << 1) | driver.value for driver in drivers]
+            max_key = max(keys)
+            conflict = bool(max_key & 1) and max_key - 1 in keys
+        strength = max_key >> 1
+        if strength < 0:
+            self.value = self.bias
+            self.conflict = False
+        else:
+            self.value = bool(max_key & 1)
+            self.conflict = conflict
         self.strength = strength
 
     @property
@@ -65,13 +166,19 @@ class Wire:
         """Determine whether this wire is high-impedance (i.e., is not driven)"""
         return self.strength < 0
 
-    def connection(self):
+    def connection(self) -> Driver:
         driver = Driver()
         self.drivers.append(driver)
         return driver
 
 
 class Rail(Wire):
+    __slots__ = ()
+
+    def __init__(self, bias: bool = False):
+        super().__init__(bias)
+        self.strength = 1
+
     def commit(self):
         # Nothing can drive a rail hard enough to shift its level
         pass
@@ -87,13 +194,22 @@ class Component(metaclass=ABCMeta):
     Each component has a set of Wire inputs, and a set of Driver outputs.
     """
 
+    # Empty slots here (plus the elaboration flag) keep the layout open so
+    # that leaf classes such as transistors can opt out of per-instance
+    # dicts; composite components simply omit __slots__ and keep theirs.
+    __slots__ = ("_elaborated",)
+
     @property
     def virtual(self) -> bool:
         """Returns True if this class's prepare method does not contain any of
         its own logic. This is the case if it simply exists to
-        organize lower-level components"""
-        return True
-    
+        organize lower-level components.
+
+        The schedule only runs non-virtual components, so rather than trusting
+        subclasses to remember a matching override, derive the answer from
+        whether the class actually overrides prepare()."""
+        return type(self).prepare is Component.prepare
+
     def prepare(self):
         """Compute new values for the outputs of this component and apply them
         to the associated drivers."""
@@ -102,16 +218,42 @@ class Component(metaclass=ABCMeta):
     def elaborate(self):
         """Perform any necessary processing between setup and the beginning of simulation.
 
-        E.g., create internal transisitors, connect drivers to wires, etc."""
+        E.g., create internal transisitors, connect drivers to wires, etc.
+
+        Elaboration walks the tree with an explicit worklist instead of
+        recursing: each component's _elaborate_local() wires up (and possibly
+        creates) its immediate subcomponents, which are then picked up from
+        subcomponents() and processed in turn.  Deep circuits therefore cost
+        one loop iteration per component rather than a Python frame per level,
+        and elaborating twice is a no-op."""
+        stack = [self]
+        while stack:
+            comp = stack.pop()
+            if getattr(comp, "_elaborated", False):
+                continue
+            if type(comp).elaborate is not Component.elaborate:
+                # The component overrides elaborate() itself; let it handle
+                # its whole subtree the old recursive way.
+                comp.elaborate()
+            else:
+                comp._elaborate_local()
+                stack.extend(comp.subcomponents())
+            comp._elaborated = True
+
+    def _elaborate_local(self):
+        """Wire up this component's immediate subcomponents.
+
+        Subcomponents must not be elaborated from here; elaborate() visits
+        them once this component's wiring is in place."""
         pass
-    
+
     @abstractmethod
-    def subcomponents(self) -> Iterator[Component]:
+    def subcomponents(self) -> Iterator["Component"]:
         """Produce a list of the individual components that this component is
         built from"""
         pass
 
-    def subcomponents_recursive(self): Iterator[Component]:
+    def subcomponents_recursive(self) -> Iterator["Component"]:
         yield self
         for sub in self.subcomponents():
             yield from sub.subcomponents_recursive()
@@ -121,9 +263,23 @@ class Component(metaclass=ABCMeta):
         """Produce a list of wires that are directly used as inputs by this
         component."""
         pass
-    
+
+    def own_outputs(self) -> Iterable[Wire]:
+        """Produce a list of wires that this component drives."""
+        return []
+
+    def fused(self):
+        """Return an (inputs, output, function) triple if this component's
+        behaviour is a pure boolean function of its input wires, or None if it
+        has to be elaborated down to transistors.
+
+        The function takes one boolean per input wire and returns the output
+        level.  A netlist built with fusing enabled uses this to evaluate the
+        component as a single node instead of simulating its internal
+        transistors and wires."""
+        return None
+
     def wires(self) -> Iterator[Wire]:
         for comp in self.subcomponents_recursive():
             yield from comp.own_wires()
-        
-    
+            yield from comp.own_outputs()
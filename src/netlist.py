@@ -0,0 +1,978 @@
+"""
+A flattened, array-backed representation of an elaborated circuit.
+
+The graph of Component, Wire, and Driver objects is convenient for describing a
+circuit, but simulating it by walking that graph means one Python-level
+attribute load and branch per driver per tick.  The Netlist instead keeps all
+driver state in parallel arrays ("struct of arrays"), grouped by the wire each
+driver belongs to, so committing every wire in the circuit is a handful of
+vectorized passes over contiguous memory when NumPy is available.
+"""
+import pickle
+from array import array
+from collections import deque
+from typing import Dict, List
+
+try:
+    import numpy
+except ImportError:  # NumPy is an optional accelerator; fall back to pure Python.
+    numpy = None
+
+try:
+    import numba
+except ImportError:  # Numba is optional too; the NumPy path is used without it.
+    numba = None
+
+try:
+    from src import _sim_kernel
+except ImportError:  # Compiled Cython kernel; optional, see build.py.
+    _sim_kernel = None
+
+try:
+    import cupy
+    import cupyx
+except ImportError:  # CuPy (GPU offload) is optional and only worth it for huge nets.
+    cupy = None
+
+#: Below this many transistors the ~10us kernel-launch latency outweighs the
+#: GPU's throughput advantage and the netlist stays on the CPU paths.
+GPU_MIN_TRANSISTORS = 100_000
+
+#: Maximum number of distinct wires a transistor cluster may touch.  Sized so
+#: one cluster's wire state (~5 bytes per wire across the value/strength/key
+#: arrays) stays within a typical 256 KB L2 cache; very large netlists are
+#: evaluated cluster by cluster instead of streaming the whole arrays.
+CLUSTER_WIRE_BUDGET = 50_000
+
+from src.core import Component, Rail, Wire, RELEASED_KEY
+from src.logic_gates import (
+    AndGate,
+    Inverter,
+    NANDGate,
+    NORGate,
+    OrGate,
+    XNORGate,
+    XORGate,
+)
+from src.transistors import BaseTransistor
+
+#: Word-level equivalents of the gate truth functions, applied to uint64
+#: "wire banks" holding one wire value per bit.  A whole bank of identical
+#: gates evaluates in a couple of bitwise instructions.
+_WORD_OPS = {
+    Inverter: lambda a, b: ~a,
+    NANDGate: lambda a, b: ~(a & b),
+    NORGate: lambda a, b: ~(a | b),
+    AndGate: lambda a, b: a & b,
+    OrGate: lambda a, b: a | b,
+    XORGate: lambda a, b: a ^ b,
+    XNORGate: lambda a, b: ~(a ^ b),
+}
+
+#: Source-level equivalents of the gate truth functions over 0/1 ints, used
+#: by emit_tick() to unroll a fused schedule into straight-line code.  Each
+#: takes the operand expressions and returns one expression string.
+_EXPR_OPS = {
+    Inverter: lambda args: "%s ^ 1" % args[0],
+    NANDGate: lambda args: "(%s) ^ 1" % " & ".join(args),
+    NORGate: lambda args: "(%s) ^ 1" % " | ".join(args),
+    AndGate: lambda args: " & ".join(args),
+    OrGate: lambda args: " | ".join(args),
+    XORGate: lambda args: " ^ ".join(args),
+    XNORGate: lambda args: "(%s) ^ 1" % " ^ ".join(args),
+}
+
+#: Assignments per generated function; very large circuits are split into
+#: several functions to stay clear of CPython's bytecode size limits.
+_TICK_CHUNK = 10_000
+
+#: Compiled tick functions keyed by their source, so netlists built from the
+#: same circuit share one compilation.
+_TICK_CACHE: Dict[str, object] = {}
+
+
+if numba is not None:
+
+    @numba.njit(cache=True, parallel=True, boundscheck=False)
+    def _transistor_kernel(
+        wire_values,
+        wire_strengths,
+        polarities,
+        gate_indices,
+        source_indices,
+        driver_indices,
+        driver_keys,
+    ):  # pragma: no cover - requires numba
+        """Evaluate every transistor in the netlist in one jitted pass."""
+        for row in numba.prange(polarities.shape[0]):
+            gate = wire_values[gate_indices[row]]
+            source = wire_values[source_indices[row]]
+            driver = driver_indices[row]
+            if gate != source and gate == polarities[row]:
+                driver_keys[driver] = (wire_strengths[source_indices[row]] << 1) | source
+            else:
+                driver_keys[driver] = RELEASED_KEY
+
+
+class FusedGate(Component):
+    """A scheduled stand-in for a component with a known truth function.
+
+    Instead of elaborating e.g. a NAND gate into 2N transistors plus internal
+    wires, the netlist schedules one of these, which drives the gate's output
+    directly from its input wires in a single prepare() call.
+    """
+
+    def __init__(self, component: Component, inputs: List[Wire], output: Wire, function) -> None:
+        self.component = component
+        self.inputs = inputs
+        self.output = output
+        self._function = function
+        self._driver = output.connection()
+
+    def prepare(self):
+        self._driver.drive(self._function(*(wire.value for wire in self.inputs)))
+
+    def subcomponents(self):
+        return iter(())
+
+    def own_wires(self):
+        yield from self.inputs
+
+    def own_outputs(self):
+        yield self.output
+
+
+def emit_tick(gates: List[FusedGate]) -> str:
+    """Unroll a fused-gate schedule into the source of a straight-line tick.
+
+    The generated function reads pre-tick wire values from ``old`` (filled
+    from ``v`` on entry, preserving the prepare-then-commit two-phase
+    semantics) and writes new values into ``v``, one plain assignment per
+    gate:
+
+        v[17] = (old[3] & old[4]) ^ 1
+
+    so a tick is a single trace of index loads and stores with no interpreter
+    dispatch, attribute lookups, or data-dependent branches.
+    """
+    lines = [
+        "v[%d] = %s"
+        % (
+            gate.output.index,
+            _EXPR_OPS[type(gate.component)](
+                ["old[%d]" % wire.index for wire in gate.inputs]
+            ),
+        )
+        for gate in gates
+    ]
+    if len(lines) <= _TICK_CHUNK:
+        return "def tick(v, old):\n    old[:] = v\n%s\n" % "\n".join(
+            "    " + line for line in lines
+        )
+    parts = []
+    calls = []
+    for n, start in enumerate(range(0, len(lines), _TICK_CHUNK)):
+        parts.append(
+            "def _tick_%d(v, old):\n%s\n"
+            % (n, "\n".join("    " + line for line in lines[start : start + _TICK_CHUNK]))
+        )
+        calls.append("    _tick_%d(v, old)" % n)
+    parts.append("def tick(v, old):\n    old[:] = v\n%s\n" % "\n".join(calls))
+    return "\n".join(parts)
+
+
+class Netlist:
+    """Struct-of-arrays view of an elaborated component tree.
+
+    Building the netlist elaborates the tree, assigns every wire an integer
+    index, and gives every driver a row in the ``driver_keys`` array.  A key
+    packs a driver's state as ``(strength << 1) | value``, which orders
+    exactly like the (strength, value) pair, so resolving a wire is a plain
+    maximum over its drivers' keys with no data-dependent branches.  Rows are
+    grouped by wire, so the drivers of any one wire are contiguous and the
+    whole-circuit commit reduces to one grouped maximum pass.
+
+    Wires that have no drivers (e.g. top-level inputs) and rails are left out
+    of the commit pass entirely; they keep their bias level.
+    """
+
+    def __init__(self, root: Component, fuse: bool = False) -> None:
+        self.root = root
+
+        # Elaborate and collect in one worklist pass.  With fusing enabled, a
+        # component that exposes a truth function via fused() is replaced by a
+        # single FusedGate node and its subtree is neither elaborated nor
+        # simulated; this works at any depth as long as the component has not
+        # already been expanded to transistors (which would double-drive its
+        # output).  Components that still override elaborate() themselves are
+        # elaborated the old recursive way and cannot be fused past.
+        components: List[Component] = []
+        stack = [root]
+        while stack:
+            comp = stack.pop()
+            if not getattr(comp, "_elaborated", False):
+                spec = comp.fused() if fuse else None
+                if spec is not None:
+                    # Reuse the FusedGate (and its output driver) across
+                    # rebuilds; creating a fresh one per build would stack a
+                    # second driver on the output wire while the old one's
+                    # frozen key kept winning the group max.
+                    gate = getattr(comp, "_fused_gate", None)
+                    if gate is None:
+                        gate = FusedGate(comp, *spec)
+                        comp._fused_gate = gate
+                    components.append(gate)
+                    continue
+                gate = getattr(comp, "_fused_gate", None)
+                if gate is not None:
+                    # Previously built fused, now elaborating to transistors:
+                    # detach the fused driver so it cannot shadow them.
+                    gate.output.drivers.remove(gate._driver)
+                    del comp._fused_gate
+                if type(comp).elaborate is not Component.elaborate:
+                    comp.elaborate()
+                else:
+                    comp._elaborate_local()
+                comp._elaborated = True
+            components.append(comp)
+            stack.extend(comp.subcomponents())
+
+        # The topology is fixed once elaboration is done, so flatten the
+        # component tree into a schedule up front: only components with real
+        # prepare() logic is kept, and the tick loop walks a plain list
+        # instead of re-entering a chain of generators.
+        self.schedule: List[Component] = [comp for comp in components if not comp.virtual]
+        for comp in self.schedule:
+            assert type(comp).prepare is not Component.prepare, (
+                "scheduled component %r has no prepare() logic" % (comp,)
+            )
+
+        self.wires: List[Wire] = []
+        seen: Dict[int, int] = {}
+        for comp in components:
+            for wire in list(comp.own_wires()) + list(comp.own_outputs()):
+                if id(wire) not in seen:
+                    seen[id(wire)] = len(self.wires)
+                    wire.index = len(self.wires)
+                    self.wires.append(wire)
+
+        # Driver rows, grouped by the wire they drive.  Walking the wires in
+        # index order makes each wire's group contiguous, so the commit pass
+        # only needs the start offset of each group.
+        driver_keys: List[int] = []
+        driver_wire_indices: List[int] = []
+        commit_wires: List[int] = []
+        offsets: List[int] = []
+        for index, wire in enumerate(self.wires):
+            if isinstance(wire, Rail) or not wire.drivers:
+                continue
+            commit_wires.append(index)
+            offsets.append(len(driver_keys))
+            for driver in wire.drivers:
+                # Read the driver's state before binding it to this netlist;
+                # afterwards the array row is its only storage.
+                key = (driver.strength << 1) | int(driver.value)
+                driver.netlist = self
+                driver.index = len(driver_keys)
+                driver_keys.append(key)
+                driver_wire_indices.append(index)
+
+        self._commit_wires = commit_wires
+        self._commit_biases = [int(self.wires[index].bias) for index in commit_wires]
+        self._offsets = offsets
+        self._group_sizes = [
+            (offsets[k + 1] if k + 1 < len(offsets) else len(driver_keys)) - offsets[k]
+            for k in range(len(offsets))
+        ]
+        # Conflicts can only happen where several drivers share a wire; if no
+        # group is larger than one the commit paths skip detection entirely.
+        self._has_shared_wires = any(size > 1 for size in self._group_sizes)
+
+        # Lower the scheduled transistors to parallel arrays of their own so a
+        # single kernel call replaces one Python prepare() per transistor.
+        # Anything else in the schedule keeps its prepare() method.
+        transistors = [comp for comp in self.schedule if isinstance(comp, BaseTransistor)]
+        self._python_schedule = [
+            comp for comp in self.schedule if not isinstance(comp, BaseTransistor)
+        ]
+        tr_polarities = [int(tr.polarity) for tr in transistors]
+        tr_gate_indices = [seen[id(tr.gate)] for tr in transistors]
+        tr_source_indices = [seen[id(tr.source)] for tr in transistors]
+        tr_driver_indices = [tr._drain_driver.index for tr in transistors]
+
+        # Cluster the transistors so each cluster's working set of wires fits
+        # in cache, and reorder the lowered arrays cluster-contiguously; the
+        # batched kernels then run once per cluster instead of streaming the
+        # whole netlist through L2 every tick.
+        order, self._clusters = self._cluster_rows(
+            tr_gate_indices, tr_source_indices, driver_wire_indices, tr_driver_indices
+        )
+        tr_polarities = [tr_polarities[row] for row in order]
+        tr_gate_indices = [tr_gate_indices[row] for row in order]
+        tr_source_indices = [tr_source_indices[row] for row in order]
+        tr_driver_indices = [tr_driver_indices[row] for row in order]
+
+        wire_values = [int(wire.value) for wire in self.wires]
+        wire_strengths = [wire.strength for wire in self.wires]
+
+        # Sensitivity information for event-driven simulation: which
+        # transistor rows and which scheduled components must be re-evaluated
+        # when a given wire changes, and which commit group a wire belongs to.
+        self._fanout_rows: List[List[int]] = [[] for _ in self.wires]
+        for row in range(len(transistors)):
+            self._fanout_rows[tr_gate_indices[row]].append(row)
+            if tr_source_indices[row] != tr_gate_indices[row]:
+                self._fanout_rows[tr_source_indices[row]].append(row)
+        self._fanout_comps: List[List[Component]] = [[] for _ in self.wires]
+        for comp in self._python_schedule:
+            for wire in comp.own_wires():
+                self._fanout_comps[seen[id(wire)]].append(comp)
+        self._commit_groups: Dict[int, int] = {
+            index: k for k, index in enumerate(commit_wires)
+        }
+
+        # If the whole schedule is fused gates with known truth functions and
+        # every gate output has that gate as its only driver, compile a
+        # straight-line tick() for the circuit: one generated assignment per
+        # gate replaces both the prepare dispatch and the commit reduction.
+        # The generic machinery below is still built as the fallback (it is
+        # what runs while tracing is enabled).
+        self._compiled_tick = None
+        self._tick_scratch = None
+        if (
+            not transistors
+            and self._python_schedule
+            and all(
+                isinstance(comp, FusedGate) and type(comp.component) in _EXPR_OPS
+                for comp in self._python_schedule
+            )
+            and all(
+                self._group_sizes[self._commit_groups[comp.output.index]] == 1
+                for comp in self._python_schedule
+            )
+        ):
+            self._compiled_gates = list(self._python_schedule)
+            fused_outputs = {comp.output.index for comp in self._compiled_gates}
+            self._compiled_input_wires = [
+                index for index in commit_wires if index not in fused_outputs
+            ]
+            source = emit_tick(self._compiled_gates)
+            tick = _TICK_CACHE.get(source)
+            if tick is None:
+                namespace: Dict[str, object] = {}
+                exec(compile(source, "<tick>", "exec"), namespace)
+                tick = _TICK_CACHE[source] = namespace["tick"]
+            self._compiled_tick = tick
+
+        # Group fused gates that share a truth function so each group can be
+        # evaluated with a couple of bitwise operations over packed wire banks
+        # (64 wires per uint64 word) instead of one Python call per gate.
+        self._bit_groups = []
+        if numpy is not None:
+            grouped: Dict[object, List[FusedGate]] = {}
+            for comp in self._python_schedule:
+                if not isinstance(comp, FusedGate) or len(comp.inputs) > 2:
+                    continue
+                op = _WORD_OPS.get(type(comp.component))
+                if op is not None:
+                    grouped.setdefault(op, []).append(comp)
+            for op, gates in grouped.items():
+                first = numpy.array([seen[id(g.inputs[0])] for g in gates], dtype=numpy.int32)
+                last = numpy.array([seen[id(g.inputs[-1])] for g in gates], dtype=numpy.int32)
+                rows = numpy.array([g._driver.index for g in gates], dtype=numpy.int32)
+                self._bit_groups.append(
+                    (
+                        op,
+                        first >> 6,
+                        (first & 63).astype(numpy.uint64),
+                        last >> 6,
+                        (last & 63).astype(numpy.uint64),
+                        rows,
+                    )
+                )
+            grouped_ids = {id(g) for gates in grouped.values() for g in gates}
+            self._python_schedule = [
+                comp for comp in self._python_schedule if id(comp) not in grouped_ids
+            ]
+
+        # GPU offload: the per-tick work (elementwise transistor evaluation
+        # plus a segmented max over driver groups) is embarrassingly data
+        # parallel, so for very large transistor-only netlists mirror the
+        # arrays on the device.  Enabled automatically above the size
+        # threshold; to_gpu() can force it for benchmarking.
+        self._gpu = None
+        if (
+            cupy is not None
+            and numpy is not None
+            and not self._python_schedule
+            and not self._bit_groups
+            and len(transistors) >= GPU_MIN_TRANSISTORS
+        ):
+            self.to_gpu()
+
+        # Bus conflicts: (tick, wire index) pairs for every commit where two
+        # drivers of the winning strength disagreed on the level.  Not
+        # recorded on the GPU path, which trades diagnostics for throughput.
+        self.conflicts: List[tuple] = []
+
+        # Transition trace: (tick, wire index, new value) triples, recorded
+        # only when tracing is enabled and only for wires that changed.
+        self.trace: List[tuple] = []
+        self.ticks = 0
+        self._tracing = False
+
+        # Nothing has been evaluated yet, so everything starts out pending.
+        self._pending_rows = set(range(len(transistors)))
+        self._pending_comps = set(self._python_schedule)
+        self._dirty_wires = set(commit_wires)
+
+        if numpy is not None:
+            self.driver_keys = numpy.array(driver_keys, dtype=numpy.int16)
+            self.driver_wire_indices = numpy.array(driver_wire_indices, dtype=numpy.int32)
+            self._offsets = numpy.array(offsets, dtype=numpy.intp)
+            self._group_sizes = numpy.array(self._group_sizes, dtype=numpy.intp)
+            self._commit_biases = numpy.array(self._commit_biases, dtype=numpy.uint8)
+            self._commit_indices = numpy.array(commit_wires, dtype=numpy.int32)
+            self._conflict_flags = numpy.zeros(len(commit_wires), dtype=numpy.uint8)
+            self.wire_values = numpy.array(wire_values, dtype=numpy.uint8)
+            self.wire_strengths = numpy.array(wire_strengths, dtype=numpy.int8)
+            self._tr_polarities = numpy.array(tr_polarities, dtype=numpy.uint8)
+            self._tr_gate_indices = numpy.array(tr_gate_indices, dtype=numpy.int32)
+            self._tr_source_indices = numpy.array(tr_source_indices, dtype=numpy.int32)
+            self._tr_driver_indices = numpy.array(tr_driver_indices, dtype=numpy.int32)
+        else:
+            # Even without NumPy, keep the state in compact typed buffers
+            # rather than lists of boxed ints: a wire value is one byte
+            # instead of a ~28-byte bool object, subscripting is a C-level
+            # operation, and none of it is traversed by the garbage
+            # collector.
+            self.driver_keys = array("h", driver_keys)
+            self.driver_wire_indices = array("l", driver_wire_indices)
+            self.wire_values = bytearray(wire_values)
+            self.wire_strengths = array("b", wire_strengths)
+            self._tr_polarities = bytearray(tr_polarities)
+            self._tr_gate_indices = array("l", tr_gate_indices)
+            self._tr_source_indices = array("l", tr_source_indices)
+            self._tr_driver_indices = array("l", tr_driver_indices)
+
+    @staticmethod
+    def _cluster_rows(gate_indices, source_indices, driver_wire_indices, driver_indices):
+        """Greedy breadth-first partition of transistor rows into clusters
+        whose working set of wires fits in cache.
+
+        Walks the transistor/wire graph from each unvisited row, closing the
+        cluster once it touches CLUSTER_WIRE_BUDGET distinct wires.  Returns
+        the new row order and a list of slices delimiting each cluster in it.
+        """
+        n_rows = len(gate_indices)
+        wire_rows: Dict[int, List[int]] = {}
+
+        def wires_of(row):
+            return (
+                gate_indices[row],
+                source_indices[row],
+                driver_wire_indices[driver_indices[row]],
+            )
+
+        for row in range(n_rows):
+            for wire in wires_of(row):
+                wire_rows.setdefault(wire, []).append(row)
+
+        order: List[int] = []
+        clusters: List[slice] = []
+        visited = [False] * n_rows
+        for seed in range(n_rows):
+            if visited[seed]:
+                continue
+            start = len(order)
+            touched: set = set()
+            queue = deque([seed])
+            visited[seed] = True
+            while queue:
+                row = queue.popleft()
+                order.append(row)
+                for wire in wires_of(row):
+                    if wire in touched:
+                        continue
+                    touched.add(wire)
+                    if len(touched) >= CLUSTER_WIRE_BUDGET:
+                        # Over budget: keep draining the queue but stop
+                        # growing the cluster through new wires.
+                        continue
+                    for other in wire_rows[wire]:
+                        if not visited[other]:
+                            visited[other] = True
+                            queue.append(other)
+            clusters.append(slice(start, len(order)))
+        return order, clusters
+
+    def set_driver(self, index: int, value: bool, strength: int) -> None:
+        """Record a driver's new level in the flat arrays.
+
+        Called from Driver.drive once the driver has been given a row.
+        """
+        self.set_driver_key(index, (strength << 1) | int(value))
+
+    def set_driver_key(self, index: int, key: int) -> None:
+        """Record a driver's new packed key, marking its wire dirty on change."""
+        if self.driver_keys[index] != key:
+            self.driver_keys[index] = key
+            self._dirty_wires.add(int(self.driver_wire_indices[index]))
+            if self._gpu is not None:
+                self._gpu_dirty_rows.add(index)
+
+    def to_gpu(self) -> None:
+        """Mirror the simulation arrays on the GPU and run ticks there.
+
+        Only the externally-driven rows travel host-to-device between ticks
+        and wire state stays resident on the GPU; call sync_from_gpu() (done
+        automatically when settle() converges) before reading Wire objects.
+        """
+        if cupy is None:
+            raise RuntimeError("GPU offload requires cupy")
+        if self._python_schedule or self._bit_groups:
+            # _gpu_tick() only evaluates the lowered transistors; scheduled
+            # components or bit-grouped fused gates would silently go stale.
+            raise RuntimeError("GPU offload only supports transistor-only netlists")
+        commit_mask = numpy.zeros(len(self.wires), dtype=bool)
+        commit_mask[self._commit_indices] = True
+        biases = numpy.array([int(wire.bias) for wire in self.wires], dtype=numpy.uint8)
+        self._gpu = {
+            "wire_values": cupy.asarray(self.wire_values),
+            "wire_strengths": cupy.asarray(self.wire_strengths),
+            "driver_keys": cupy.asarray(self.driver_keys),
+            "driver_wire_indices": cupy.asarray(self.driver_wire_indices),
+            "polarities": cupy.asarray(self._tr_polarities),
+            "gate_indices": cupy.asarray(self._tr_gate_indices),
+            "source_indices": cupy.asarray(self._tr_source_indices),
+            "driver_indices": cupy.asarray(self._tr_driver_indices),
+            "biases": cupy.asarray(biases),
+            "commit_mask": cupy.asarray(commit_mask),
+            "max_keys": cupy.empty(len(self.wires), dtype=cupy.int16),
+        }
+        self._gpu_dirty_rows = set()
+
+    def sync_from_gpu(self) -> None:
+        """Copy wire state back from the device onto the host arrays and the
+        Wire objects."""
+        self.wire_values[:] = cupy.asnumpy(self._gpu["wire_values"])
+        self.wire_strengths[:] = cupy.asnumpy(self._gpu["wire_strengths"])
+        for index in self._commit_wires:
+            wire = self.wires[index]
+            wire.value = bool(self.wire_values[index])
+            wire.strength = int(self.wire_strengths[index])
+
+    def _gpu_tick(self) -> None:  # pragma: no cover - requires cupy
+        gpu = self._gpu
+        if self._gpu_dirty_rows:
+            # Push externally-driven rows (inputs) to the device.
+            rows = numpy.fromiter(self._gpu_dirty_rows, dtype=numpy.int64)
+            gpu["driver_keys"][cupy.asarray(rows)] = cupy.asarray(self.driver_keys[rows])
+            self._gpu_dirty_rows.clear()
+        gates = gpu["wire_values"][gpu["gate_indices"]]
+        sources = gpu["wire_values"][gpu["source_indices"]]
+        conducting = (gates != sources) & (gates == gpu["polarities"])
+        source_keys = (
+            gpu["wire_strengths"][gpu["source_indices"]].astype(cupy.int16) << 1
+        ) | sources
+        gpu["driver_keys"][gpu["driver_indices"]] = cupy.where(
+            conducting, source_keys, RELEASED_KEY
+        )
+        # Segmented max over driver groups, scattered by wire index.
+        max_keys = gpu["max_keys"]
+        max_keys.fill(numpy.iinfo(numpy.int16).min)
+        cupyx.scatter_max(max_keys, gpu["driver_wire_indices"], gpu["driver_keys"])
+        strengths = (max_keys >> 1).astype(cupy.int8)
+        values = cupy.where(strengths < 0, gpu["biases"], (max_keys & 1).astype(cupy.uint8))
+        mask = gpu["commit_mask"]
+        gpu["wire_values"] = cupy.where(mask, values, gpu["wire_values"])
+        gpu["wire_strengths"] = cupy.where(mask, strengths, gpu["wire_strengths"])
+
+    def tick(self) -> None:
+        """Run one simulation step: prepare every scheduled component, then
+        commit every driven wire."""
+        # A full pass consumes everything queued for the event-driven path,
+        # but it only advances one delta cycle: the commit below re-queues
+        # the fanout of every wire it changes, so a later settle() resumes
+        # the propagation rather than returning stale state.
+        self._pending_rows.clear()
+        self._pending_comps.clear()
+        self._dirty_wires.clear()
+        if self._gpu is not None:
+            self._gpu_tick()
+        elif self._compiled_tick is not None and not self._tracing:
+            self._tick_compiled()
+        else:
+            self.prepare_all()
+            self.commit_all()
+        self.ticks += 1
+        # Every driven wire was just committed, so driver changes recorded
+        # during the pass need no separate commit of their own.
+        self._dirty_wires.clear()
+
+    def settle(self, limit: int = 1000) -> int:
+        """Run delta cycles until the circuit reaches a stable state.
+
+        Rather than evaluating every transistor each cycle, only the fan-out
+        of wires that actually changed is re-evaluated; on a steady circuit a
+        single input edge touches a small fraction of the netlist.  With NumPy
+        the batched passes are cheap enough that whole-netlist passes are run
+        instead, but convergence is still detected per delta cycle.
+
+        Returns the number of delta cycles it took, and raises RuntimeError if
+        the circuit has not settled after ``limit`` cycles (which indicates a
+        combinational loop such as an unclocked latch oscillating).
+        """
+        if self._gpu is not None:  # pragma: no cover - requires cupy
+            gpu = self._gpu
+            for iteration in range(limit):
+                before_values = gpu["wire_values"].copy()
+                before_strengths = gpu["wire_strengths"].copy()
+                self.tick()
+                if bool(
+                    (before_values == gpu["wire_values"]).all()
+                    and (before_strengths == gpu["wire_strengths"]).all()
+                ):
+                    self.sync_from_gpu()
+                    return iteration
+            raise RuntimeError("circuit did not settle after %d delta cycles" % limit)
+
+        if numpy is not None:
+            for iteration in range(limit):
+                before_values = self.wire_values.copy()
+                before_strengths = self.wire_strengths.copy()
+                self.tick()
+                if (
+                    numpy.array_equal(before_values, self.wire_values)
+                    and numpy.array_equal(before_strengths, self.wire_strengths)
+                ):
+                    return iteration
+            raise RuntimeError("circuit did not settle after %d delta cycles" % limit)
+
+        if self._compiled_tick is not None and not self._tracing:
+            # Without NumPy the compiled straight-line tick still beats the
+            # event-driven loop below; convergence is a plain list compare.
+            for iteration in range(limit):
+                before = bytes(self.wire_values)
+                self.tick()
+                if before == self.wire_values:
+                    return iteration
+            raise RuntimeError("circuit did not settle after %d delta cycles" % limit)
+
+        for iteration in range(limit):
+            if not (self._pending_rows or self._pending_comps or self._dirty_wires):
+                return iteration
+            pending_rows = self._pending_rows
+            pending_comps = self._pending_comps
+            self._pending_rows = set()
+            self._pending_comps = set()
+            for row in pending_rows:
+                self._prepare_row(row)
+            for comp in pending_comps:
+                comp.prepare()  # marks dirty wires through set_driver
+            dirty = self._dirty_wires
+            self._dirty_wires = set()
+            for index in dirty:
+                if self._commit_wire(index):
+                    self._pending_rows.update(self._fanout_rows[index])
+                    self._pending_comps.update(self._fanout_comps[index])
+            self.ticks += 1
+        raise RuntimeError("circuit did not settle after %d delta cycles" % limit)
+
+    def _tick_compiled(self) -> None:
+        """Run one tick through the generated straight-line function.
+
+        Externally driven wires (inputs) are committed from their driver keys
+        first; the generated code then covers every fused gate.  Gate driver
+        keys and Wire attributes are refreshed afterwards so snapshots and
+        attribute reads stay consistent with the array state.
+        """
+        for index in self._compiled_input_wires:
+            if self._commit_wire(index):
+                self._pending_comps.update(self._fanout_comps[index])
+        if self._tick_scratch is None:
+            if numpy is not None:
+                self._tick_scratch = numpy.empty_like(self.wire_values)
+            else:
+                self._tick_scratch = bytearray(len(self.wire_values))
+        self._compiled_tick(self.wire_values, self._tick_scratch)
+        wire_values = self.wire_values
+        old_values = self._tick_scratch
+        for gate in self._compiled_gates:
+            index = gate.output.index
+            value = wire_values[index]
+            if value != old_values[index]:
+                # As in commit_all: queue changed fanout for a later settle().
+                self._pending_comps.update(self._fanout_comps[index])
+            self.wire_strengths[index] = 1
+            self.driver_keys[gate._driver.index] = 2 | value
+            wire = gate.output
+            wire.value = bool(value)
+            wire.strength = 1
+
+    def _prepare_row(self, row: int) -> None:
+        """Evaluate a single lowered transistor, marking its wire dirty if its
+        driver key changed."""
+        gate = self.wire_values[self._tr_gate_indices[row]]
+        source_index = self._tr_source_indices[row]
+        if gate != self.wire_values[source_index] and gate == self._tr_polarities[row]:
+            key = (self.wire_strengths[source_index] << 1) | self.wire_values[source_index]
+        else:
+            key = RELEASED_KEY
+        driver = self._tr_driver_indices[row]
+        if self.driver_keys[driver] != key:
+            self.driver_keys[driver] = key
+            self._dirty_wires.add(int(self.driver_wire_indices[driver]))
+
+    def enable_trace(self) -> None:
+        """Record wire transitions from now on.
+
+        Rather than dumping every wire every tick, only (tick, wire index,
+        new value) triples for wires whose committed level changed are kept,
+        so a long trace costs memory proportional to the number of
+        transitions instead of cycles times wires.
+        """
+        self._tracing = True
+
+    def iter_transitions(self, wire):
+        """Yield (tick, value) pairs recorded for one wire (or wire index)."""
+        index = wire.index if isinstance(wire, Wire) else wire
+        for tick, wire_index, value in self.trace:
+            if wire_index == index:
+                yield tick, value
+
+    def save_state(self, path: str) -> None:
+        """Snapshot the simulation state (wire levels and driver keys).
+
+        Harnesses that re-run the same power-up sequence for every experiment
+        can save once after settling and then load_state() to skip the warm-up
+        ticks entirely.  The snapshot is an .npz file with NumPy, otherwise a
+        pickle of the flat lists; either way it only makes sense to restore it
+        into a netlist built from the same circuit.
+        """
+        if numpy is not None:
+            numpy.savez(
+                path,
+                wire_values=self.wire_values,
+                wire_strengths=self.wire_strengths,
+                driver_keys=self.driver_keys,
+            )
+        else:
+            with open(path, "wb") as handle:
+                pickle.dump(
+                    {
+                        "wire_values": self.wire_values,
+                        "wire_strengths": self.wire_strengths,
+                        "driver_keys": self.driver_keys,
+                    },
+                    handle,
+                )
+
+    def load_state(self, path: str) -> None:
+        """Restore a snapshot written by save_state()."""
+        if numpy is not None:
+            data = numpy.load(path if path.endswith(".npz") else path + ".npz")
+        else:
+            with open(path, "rb") as handle:
+                data = pickle.load(handle)
+        if len(data["wire_values"]) != len(self.wires) or len(data["driver_keys"]) != len(
+            self.driver_keys
+        ):
+            raise ValueError("snapshot does not match this netlist")
+        self.wire_values[:] = data["wire_values"]
+        self.wire_strengths[:] = data["wire_strengths"]
+        self.driver_keys[:] = data["driver_keys"]
+        for index, wire in enumerate(self.wires):
+            wire.value = bool(self.wire_values[index])
+            wire.strength = int(self.wire_strengths[index])
+        # The snapshot is self-consistent, so nothing is pending until an
+        # input changes again.
+        self._pending_rows.clear()
+        self._pending_comps.clear()
+        self._dirty_wires.clear()
+
+    def _commit_wire(self, index: int) -> bool:
+        """Commit a single wire, returning True if its level changed."""
+        k = self._commit_groups.get(index)
+        if k is None:
+            return False
+        start = self._offsets[k]
+        end = self._offsets[k + 1] if k + 1 < len(self._offsets) else len(self.driver_keys)
+        group = self.driver_keys[start:end]
+        max_key = max(group)
+        strength = max_key >> 1
+        wire = self.wires[index]
+        value = bool(max_key & 1) if strength >= 0 else wire.bias
+        if max_key & 1 and strength >= 0 and max_key - 1 in group:
+            self.conflicts.append((self.ticks, index))
+        if value == wire.value and strength == wire.strength:
+            return False
+        if self._tracing and value != wire.value:
+            self.trace.append((self.ticks, index, value))
+        wire.value = value
+        wire.strength = strength
+        self.wire_values[index] = int(value)
+        self.wire_strengths[index] = strength
+        return True
+
+    def prepare_all(self) -> None:
+        """Evaluate every scheduled component.
+
+        Transistors are evaluated as one batched pass over the lowered arrays
+        (jitted with numba when available, vectorized with NumPy otherwise);
+        other scheduled components fall back to their prepare() methods.
+        """
+        if len(self._tr_polarities):
+            if numba is not None:
+                for part in self._clusters:
+                    _transistor_kernel(
+                        self.wire_values,
+                        self.wire_strengths,
+                        self._tr_polarities[part],
+                        self._tr_gate_indices[part],
+                        self._tr_source_indices[part],
+                        self._tr_driver_indices[part],
+                        self.driver_keys,
+                    )
+            elif _sim_kernel is not None and numpy is not None:
+                for part in self._clusters:
+                    _sim_kernel.prepare_transistors(
+                        self.wire_values,
+                        self.wire_strengths,
+                        self._tr_polarities[part],
+                        self._tr_gate_indices[part],
+                        self._tr_source_indices[part],
+                        self._tr_driver_indices[part],
+                        self.driver_keys,
+                    )
+            elif numpy is not None:
+                for part in self._clusters:
+                    gate_indices = self._tr_gate_indices[part]
+                    source_indices = self._tr_source_indices[part]
+                    gates = self.wire_values[gate_indices]
+                    sources = self.wire_values[source_indices]
+                    conducting = (gates != sources) & (gates == self._tr_polarities[part])
+                    source_keys = (
+                        self.wire_strengths[source_indices].astype(numpy.int16) << 1
+                    ) | sources
+                    self.driver_keys[self._tr_driver_indices[part]] = numpy.where(
+                        conducting, source_keys, RELEASED_KEY
+                    )
+            else:
+                wire_values = self.wire_values
+                wire_strengths = self.wire_strengths
+                driver_keys = self.driver_keys
+                gate_indices = self._tr_gate_indices
+                source_indices = self._tr_source_indices
+                driver_indices = self._tr_driver_indices
+                for row, polarity in enumerate(self._tr_polarities):
+                    gate = wire_values[gate_indices[row]]
+                    source = wire_values[source_indices[row]]
+                    driver = driver_indices[row]
+                    if gate != source and gate == polarity:
+                        driver_keys[driver] = (wire_strengths[source_indices[row]] << 1) | source
+                    else:
+                        driver_keys[driver] = RELEASED_KEY
+        if self._bit_groups:
+            # Pack wire values into uint64 banks (bit i of word i//64 is wire
+            # i), then evaluate each group of identical gates with bitwise
+            # operations on gathered words.
+            packed = numpy.packbits(self.wire_values, bitorder="little")
+            pad = (-len(packed)) % 8
+            if pad:
+                packed = numpy.concatenate(
+                    [packed, numpy.zeros(pad, dtype=numpy.uint8)]
+                )
+            words = packed.view(numpy.uint64)
+            one = numpy.uint64(1)
+            for op, first_words, first_bits, last_words, last_bits, rows in self._bit_groups:
+                a = (words[first_words] >> first_bits) & one
+                b = (words[last_words] >> last_bits) & one
+                bits = op(a, b) & one
+                # Strength 1 with the computed value, as Driver.drive would do.
+                self.driver_keys[rows] = (bits | numpy.uint64(2)).astype(numpy.int16)
+        for comp in self._python_schedule:
+            comp.prepare()
+
+    def commit_all(self) -> None:
+        """Commit every driven wire in the circuit in one pass.
+
+        Because keys order like (strength, value) pairs, the winning driver of
+        each wire is simply the maximum key of its group: with NumPy a single
+        grouped ``maximum.reduceat``, without it a branch-free ``max`` per
+        group.  The results are written back onto the Wire objects, since
+        prepare() still reads wire attributes.
+        """
+        if not self._commit_wires:
+            return
+        if numpy is not None:
+            old_values = self.wire_values[self._commit_indices].copy() if self._tracing else None
+            if _sim_kernel is not None:
+                _sim_kernel.commit_wires(
+                    self.driver_keys,
+                    self._offsets,
+                    self._commit_indices,
+                    self._commit_biases,
+                    self.wire_values,
+                    self.wire_strengths,
+                    self._conflict_flags,
+                )
+                if self._has_shared_wires and self._conflict_flags.any():
+                    for k in numpy.nonzero(self._conflict_flags)[0]:
+                        self.conflicts.append((self.ticks, int(self._commit_indices[k])))
+            else:
+                max_keys = numpy.maximum.reduceat(self.driver_keys, self._offsets)
+                max_strengths = max_keys >> 1
+                values = numpy.where(max_strengths < 0, self._commit_biases, max_keys & 1)
+                self.wire_values[self._commit_indices] = values
+                self.wire_strengths[self._commit_indices] = max_strengths
+                if self._has_shared_wires:
+                    # A group conflicts iff its max key is odd (winner drives
+                    # high) and some driver holds the even key one below it:
+                    # the same strength driving low.  All branchless; the
+                    # per-group reduction mirrors the maximum above.
+                    rivals = self.driver_keys == numpy.repeat(max_keys, self._group_sizes) - 1
+                    conflicts = (
+                        numpy.logical_or.reduceat(rivals, self._offsets)
+                        & (max_keys & 1).astype(bool)
+                        & (max_strengths >= 0)
+                    )
+                    if conflicts.any():
+                        for k in numpy.nonzero(conflicts)[0]:
+                            self.conflicts.append(
+                                (self.ticks, int(self._commit_indices[k]))
+                            )
+            for k, index in enumerate(self._commit_wires):
+                wire = self.wires[index]
+                wire.value = bool(self.wire_values[index])
+                wire.strength = int(self.wire_strengths[index])
+            if self._tracing:
+                new_values = self.wire_values[self._commit_indices]
+                for k in numpy.nonzero(old_values != new_values)[0]:
+                    self.trace.append(
+                        (self.ticks, int(self._commit_indices[k]), bool(new_values[k]))
+                    )
+        else:
+            driver_keys = self.driver_keys
+            total = len(driver_keys)
+            for k, index in enumerate(self._commit_wires):
+                wire = self.wires[index]
+                start = self._offsets[k]
+                end = self._offsets[k + 1] if k + 1 < len(self._offsets) else total
+                group = driver_keys[start:end]
+                max_key = max(group)
+                strength = max_key >> 1
+                value = bool(max_key & 1) if strength >= 0 else wire.bias
+                if max_key & 1 and strength >= 0 and max_key - 1 in group:
+                    self.conflicts.append((self.ticks, index))
+                if value != wire.value or strength != wire.strength:
+                    # Queue the fanout of changed wires so a later settle()
+                    # picks up the propagation where this pass left off.
+                    self._pending_rows.update(self._fanout_rows[index])
+                    self._pending_comps.update(self._fanout_comps[index])
+                if self._tracing and value != wire.value:
+                    self.trace.append((self.ticks, index, value))
+                wire.value = value
+                wire.strength = strength
+                self.wire_values[index] = int(value)
+                self.wire_strengths[index] = strength
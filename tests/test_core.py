@@ -0,0 +1,142 @@
+from unittest import TestCase
+
+from src.core import Driver, Rail, Wire
+
+
+class DriverTests(TestCase):
+    def setUp(self):
+        self.wire = Wire()
+        self.driver = self.wire.connection()
+
+    def test_starts_released(self):
+        assert self.driver.value is False
+        assert self.driver.strength == -1
+
+    def test_drive(self):
+        self.driver.drive(True)
+        assert self.driver.value is True
+        assert self.driver.strength == 1
+
+    def test_pull_is_weaker_than_drive(self):
+        self.driver.pull(True)
+        assert self.driver.strength == 0
+
+        other = self.wire.connection().drive(False)
+        self.wire.commit()
+        assert self.wire.value is False
+        assert other.strength > self.driver.strength
+
+    def test_release(self):
+        self.driver.drive(True).release()
+        assert self.driver.strength == -1
+        self.wire.commit()
+        assert self.wire.is_hiZ
+
+    def test_connect_copies_level_and_strength(self):
+        source = Wire()
+        source.connection().pull(True)
+        source.commit()
+        self.driver.connect(source)
+        assert self.driver.value is True
+        assert self.driver.strength == 0
+
+
+class WireCommitTests(TestCase):
+    def test_no_drivers_keeps_bias(self):
+        for bias in (False, True):
+            wire = Wire(bias)
+            wire.commit()
+            assert wire.value is bias
+            assert wire.is_hiZ
+            assert wire.conflict is False
+
+    def test_single_driver(self):
+        wire = Wire()
+        wire.connection().drive(True)
+        wire.commit()
+        assert wire.value is True
+        assert wire.strength == 1
+        assert wire.conflict is False
+
+    def test_two_drivers_strongest_wins(self):
+        wire = Wire()
+        wire.connection().pull(True)
+        wire.connection().drive(False)
+        wire.commit()
+        assert wire.value is False
+        assert wire.strength == 1
+        assert wire.conflict is False
+
+    def test_two_driver_conflict(self):
+        wire = Wire()
+        wire.connection().drive(True)
+        wire.connection().drive(False)
+        wire.commit()
+        assert wire.conflict is True
+        assert wire.strength == 1
+
+    def test_two_agreeing_drivers_do_not_conflict(self):
+        wire = Wire()
+        wire.connection().drive(True)
+        wire.connection().drive(True)
+        wire.commit()
+        assert wire.value is True
+        assert wire.conflict is False
+
+    def test_many_drivers(self):
+        wire = Wire()
+        wire.connection().release()
+        wire.connection().pull(False)
+        wire.connection().drive(True)
+        wire.connection().drive(False)
+        wire.commit()
+        assert wire.value is True
+        assert wire.strength == 1
+        assert wire.conflict is True
+
+    def test_released_drivers_leave_bias(self):
+        wire = Wire(bias=True)
+        wire.connection().release()
+        wire.connection().release()
+        wire.commit()
+        assert wire.value is True
+        assert wire.is_hiZ
+
+
+class RailTests(TestCase):
+    def test_fixed_levels(self):
+        assert Rail.GROUND.value is False
+        assert Rail.VCC.value is True
+        assert Rail.VCC.strength == 1
+
+    def test_commit_does_not_move_the_rail(self):
+        rail = Rail(True)
+        rail.connection().drive(False)
+        rail.commit()
+        assert rail.value is True
+
+
+class WirePoolTests(TestCase):
+    def setUp(self):
+        del Wire._pool[:]
+
+    def test_obtain_reuses_recycled_instance(self):
+        wire = Wire()
+        drivers = wire.drivers
+        wire.connection().drive(True)
+        wire.commit()
+        wire.recycle()
+
+        reused = Wire.obtain(bias=True)
+        assert reused is wire
+        assert reused.drivers is drivers
+        assert reused.drivers == []
+        assert reused.value is True
+        assert reused.strength == -1
+        assert reused.index is None
+        assert reused.conflict is False
+
+    def test_rails_are_never_pooled(self):
+        rail = Rail(True)
+        rail.recycle()
+        assert Wire.obtain() is not rail
@@ -0,0 +1,346 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import src.netlist
+from src.core import Component, Wire
+from src.logic_gates import (
+    AndGate,
+    Inverter,
+    NANDGate,
+    NORGate,
+    OrGate,
+    XNORGate,
+    XORGate,
+)
+from src.netlist import Netlist, emit_tick
+
+
+def build_gate(gate_class):
+    """Return a two-input gate with one external driver per input."""
+    gate = gate_class()
+    gate.add_input(Wire(), Wire())
+    drivers = [wire.connection() for wire in gate.inputs]
+    return gate, drivers
+
+
+def truth_table(gate, drivers, netlist):
+    outputs = []
+    for a in (False, True):
+        for b in (False, True):
+            drivers[0].drive(a)
+            drivers[1].drive(b)
+            netlist.settle()
+            outputs.append(gate.output.value)
+    return outputs
+
+
+class GateNetlistTests(TestCase):
+
+    TRUTH_TABLES = (
+        (NANDGate, [True, True, True, False]),
+        (NORGate, [True, False, False, False]),
+        (AndGate, [False, False, False, True]),
+        (OrGate, [False, True, True, True]),
+        (XORGate, [False, True, True, False]),
+        (XNORGate, [True, False, False, True]),
+    )
+
+    def test_transistor_level(self):
+        for gate_class, expected in self.TRUTH_TABLES:
+            gate, drivers = build_gate(gate_class)
+            netlist = Netlist(gate)
+            assert truth_table(gate, drivers, netlist) == expected, gate_class
+
+    def test_fused(self):
+        for gate_class, expected in self.TRUTH_TABLES:
+            gate, drivers = build_gate(gate_class)
+            netlist = Netlist(gate, fuse=True)
+            assert truth_table(gate, drivers, netlist) == expected, gate_class
+
+    def test_inverter(self):
+        for fuse in (False, True):
+            inverter = Inverter()
+            driver = inverter.input.connection()
+            netlist = Netlist(inverter, fuse=fuse)
+            driver.drive(True)
+            netlist.settle()
+            assert inverter.output.value is False
+            driver.drive(False)
+            netlist.settle()
+            assert inverter.output.value is True
+
+    def test_settle_reports_delta_cycles(self):
+        gate, drivers = build_gate(NANDGate)
+        netlist = Netlist(gate)
+        drivers[0].drive(True)
+        drivers[1].drive(True)
+        cycles = netlist.settle()
+        assert cycles > 0
+        # A stable circuit settles immediately.
+        assert netlist.settle() == 0
+
+
+class SRLatch(Component):
+    """Cross-coupled NOR gates; the smallest stateful feedback circuit."""
+
+    def __init__(self):
+        self.q_gate = NORGate()
+        self.qbar_gate = NORGate()
+        self.reset = Wire()
+        self.set = Wire()
+
+    def _elaborate_local(self):
+        self.q_gate.add_input(self.reset, self.qbar_gate.output)
+        self.qbar_gate.add_input(self.set, self.q_gate.output)
+
+    def subcomponents(self):
+        yield self.q_gate
+        yield self.qbar_gate
+
+    def own_wires(self):
+        yield self.reset
+        yield self.set
+
+
+class InverterChain(Component):
+    """A straight chain of inverters."""
+
+    def __init__(self, length):
+        self.inverters = []
+        self.head = Wire()
+        wire = self.head
+        for _ in range(length):
+            inverter = Inverter()
+            inverter.input = wire
+            wire = inverter.output
+            self.inverters.append(inverter)
+        self.tail = wire
+
+    def subcomponents(self):
+        yield from self.inverters
+
+    def own_wires(self):
+        yield self.head
+
+
+class FeedbackTests(TestCase):
+    def test_sr_latch_holds_state(self):
+        latch = SRLatch()
+        set_driver = latch.set.connection()
+        reset_driver = latch.reset.connection()
+        netlist = Netlist(latch)
+
+        set_driver.drive(True)
+        reset_driver.drive(False)
+        netlist.settle()
+        assert latch.q_gate.output.value is True
+
+        # Releasing the set input must not lose the stored bit.
+        set_driver.drive(False)
+        netlist.settle()
+        assert latch.q_gate.output.value is True
+
+        reset_driver.drive(True)
+        netlist.settle()
+        assert latch.q_gate.output.value is False
+        reset_driver.drive(False)
+        netlist.settle()
+        assert latch.q_gate.output.value is False
+
+    def test_ring_oscillator_never_settles(self):
+        inverter = Inverter()
+        inverter.input = inverter.output
+        netlist = Netlist(inverter)
+        with self.assertRaises(RuntimeError):
+            netlist.settle(limit=50)
+
+    def test_tick_then_settle_resumes_propagation(self):
+        chain = InverterChain(3)
+        driver = chain.head.connection()
+        netlist = Netlist(chain)
+        driver.drive(False)
+        netlist.settle()
+        assert chain.tail.value is True
+
+        # tick() advances one delta cycle; settle() must pick up the
+        # propagation of the wires that pass changed, not return stale state.
+        driver.drive(True)
+        netlist.tick()
+        netlist.settle()
+        assert chain.tail.value is False
+
+    def test_tick_then_traced_settle_on_fused_chain(self):
+        chain = InverterChain(3)
+        driver = chain.head.connection()
+        netlist = Netlist(chain, fuse=True)
+        driver.drive(False)
+        netlist.settle()
+        assert chain.tail.value is True
+
+        # The compiled tick must also queue changed fanout: enabling tracing
+        # afterwards routes settle() through the event-driven loop.
+        driver.drive(True)
+        netlist.tick()
+        netlist.enable_trace()
+        netlist.settle()
+        assert chain.tail.value is False
+
+
+class ConflictTests(TestCase):
+    def test_contended_input_is_logged(self):
+        inverter = Inverter()
+        high = inverter.input.connection()
+        low = inverter.input.connection()
+        netlist = Netlist(inverter)
+        high.drive(True)
+        low.drive(False)
+        netlist.settle()
+        index = inverter.input.index
+        assert any(wire == index for _, wire in netlist.conflicts)
+
+    def test_agreement_is_not_logged(self):
+        inverter = Inverter()
+        first = inverter.input.connection()
+        second = inverter.input.connection()
+        netlist = Netlist(inverter)
+        first.drive(True)
+        second.drive(True)
+        netlist.settle()
+        assert netlist.conflicts == []
+
+
+class TraceTests(TestCase):
+    def test_only_transitions_are_recorded(self):
+        gate, drivers = build_gate(NANDGate)
+        netlist = Netlist(gate, fuse=True)
+        drivers[0].drive(True)
+        drivers[1].drive(True)
+        netlist.settle()
+
+        netlist.enable_trace()
+        drivers[0].drive(False)
+        netlist.settle()
+        transitions = list(netlist.iter_transitions(gate.output))
+        assert [value for _, value in transitions] == [True]
+
+        # Settling again without input changes must not add entries.
+        netlist.settle()
+        assert list(netlist.iter_transitions(gate.output)) == transitions
+
+    def test_trace_off_by_default(self):
+        gate, drivers = build_gate(NANDGate)
+        netlist = Netlist(gate)
+        drivers[0].drive(True)
+        drivers[1].drive(True)
+        netlist.settle()
+        assert netlist.trace == []
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'state')
+
+    def test_round_trip(self):
+        gate, drivers = build_gate(NANDGate)
+        netlist = Netlist(gate)
+        drivers[0].drive(True)
+        drivers[1].drive(True)
+        netlist.settle()
+        assert gate.output.value is False
+        netlist.save_state(self.path)
+
+        drivers[0].drive(False)
+        netlist.settle()
+        assert gate.output.value is True
+
+        netlist.load_state(self.path)
+        assert gate.output.value is False
+
+    def test_mismatched_snapshot_is_rejected(self):
+        gate, drivers = build_gate(NANDGate)
+        netlist = Netlist(gate)
+        netlist.settle()
+        netlist.save_state(self.path)
+
+        inverter = Inverter()
+        inverter.input.connection()
+        other = Netlist(inverter)
+        with self.assertRaises(ValueError):
+            other.load_state(self.path)
+
+
+class RebuildTests(TestCase):
+    def test_fused_rebuild_reuses_the_fused_driver(self):
+        gate, drivers = build_gate(NANDGate)
+        first = Netlist(gate, fuse=True)
+        drivers[0].drive(False)
+        drivers[1].drive(True)
+        first.settle()
+        assert gate.output.value is True
+        assert len(gate.output.drivers) == 1
+
+        second = Netlist(gate, fuse=True)
+        assert len(gate.output.drivers) == 1
+        drivers[0].drive(True)
+        second.settle()
+        assert gate.output.value is False
+        assert second.conflicts == []
+
+    def test_fused_then_transistor_rebuild_detaches_the_fused_driver(self):
+        gate, drivers = build_gate(NANDGate)
+        first = Netlist(gate, fuse=True)
+        drivers[0].drive(True)
+        drivers[1].drive(True)
+        first.settle()
+        assert gate.output.value is False
+
+        second = Netlist(gate)
+        # Two pull-ups and the pull-down chain; the fused driver is gone.
+        assert len(gate.output.drivers) == 3
+        assert truth_table(gate, drivers, second) == [True, True, True, False]
+
+
+class EmitTickTests(TestCase):
+    def test_source_is_one_assignment_per_gate(self):
+        gate, drivers = build_gate(NANDGate)
+        netlist = Netlist(gate, fuse=True)
+        assert netlist._compiled_tick is not None
+        source = emit_tick(netlist._compiled_gates)
+        expected = 'v[%d] = (old[%d] & old[%d]) ^ 1' % (
+            gate.output.index,
+            gate.inputs[0].index,
+            gate.inputs[1].index,
+        )
+        assert expected in source
+
+    def test_identical_circuits_share_one_compilation(self):
+        first_gate, _ = build_gate(NANDGate)
+        second_gate, _ = build_gate(NANDGate)
+        first = Netlist(first_gate, fuse=True)
+        second = Netlist(second_gate, fuse=True)
+        assert first._compiled_tick is second._compiled_tick
+
+    def test_transistor_netlists_are_not_compiled(self):
+        gate, drivers = build_gate(NANDGate)
+        netlist = Netlist(gate)
+        assert netlist._compiled_tick is None
+
+    def test_chunked_functions_behave_identically(self):
+        chunk = src.netlist._TICK_CHUNK
+        src.netlist._TICK_CHUNK = 2
+        try:
+            chain = InverterChain(7)
+            driver = chain.head.connection()
+            netlist = Netlist(chain, fuse=True)
+            source = emit_tick(netlist._compiled_gates)
+            assert '_tick_3' in source
+
+            driver.drive(True)
+            netlist.settle()
+            assert chain.tail.value is False
+            driver.drive(False)
+            netlist.settle()
+            assert chain.tail.value is True
+        finally:
+            src.netlist._TICK_CHUNK = chunk